@@ -1,26 +1,44 @@
 # timetable_generator.py
-# Requirements: streamlit, pandas, openpyxl, xlsxwriter
-# pip install streamlit pandas openpyxl xlsxwriter
+# Requirements: streamlit, pandas, numpy, openpyxl, xlsxwriter
+# pip install streamlit pandas numpy openpyxl xlsxwriter
 
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta, time
+import numpy as np
+from datetime import datetime, time
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import random
+import re
+
+try:
+    from numba import njit
+    _HAVE_NUMBA = True
+except ImportError:  # numba is optional; the kernels also run as plain Python
+    _HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        def decorator(func):
+            return func
+        return decorator
 
 st.set_page_config(page_title="Automatic Timetable Generator", layout="wide")
 
 # ------------------------- UI HELPERS -------------------------
+@st.cache_data
 def time_slots(start_t: time, period_minutes: int, periods_per_day: int):
     """Return list of 'HH:MM - HH:MM' strings for each period."""
-    slots = []
-    cursor = datetime.combine(datetime.today(), start_t)
-    for _ in range(periods_per_day):
-        end = cursor + timedelta(minutes=period_minutes)
-        slots.append(f"{cursor.strftime('%H:%M')}–{end.strftime('%H:%M')}")
-        cursor = end
-    return slots
+    ts = pd.date_range(
+        datetime.combine(datetime.today(), start_t),
+        periods=periods_per_day + 1,
+        freq=f"{period_minutes}min",
+    ).strftime("%H:%M").to_numpy()
+    return [f"{ts[i]}–{ts[i + 1]}" for i in range(periods_per_day)]
 
+@st.cache_data
 def seed_subject_rows():
     return pd.DataFrame(
         [
@@ -29,17 +47,19 @@ def seed_subject_rows():
         ]
     )
 
+_LONG_TYPE_RE = re.compile(r"lab|project", re.IGNORECASE)
+
 def sanitize_subjects(df: pd.DataFrame):
     """Clean and normalize the subject config table."""
     df = df.fillna({"Subject": "", "Type": "Theory", "Periods_per_Week": 0, "Is_Long_Session": False, "Session_Length": 1})
     df["Subject"] = df["Subject"].astype(str).str.strip()
     df["Type"] = df["Type"].astype(str).str.strip()
-    # Force ints
-    for col in ["Periods_per_Week", "Session_Length"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
+    # Force ints, both columns in one pass
+    int_cols = ["Periods_per_Week", "Session_Length"]
+    df[int_cols] = df[int_cols].apply(pd.to_numeric, errors="coerce").fillna(0).astype(np.int32)
     df["Is_Long_Session"] = df["Is_Long_Session"].astype(bool)
     # Normalize: if Type is Lab/Project, Is_Long_Session True by default
-    df.loc[df["Type"].str.lower().str.contains("lab") | df["Type"].str.lower().str.contains("project"), "Is_Long_Session"] = True
+    df.loc[df["Type"].str.contains(_LONG_TYPE_RE, na=False), "Is_Long_Session"] = True
     # Remove empty rows
     df = df[df["Subject"] != ""].copy()
     return df
@@ -53,94 +73,449 @@ def build_requirements(subject_df: pd.DataFrame):
     """
     singles = {}
     blocks = []
-    for _, row in subject_df.iterrows():
-        subj = row["Subject"]
-        if row.get("Is_Long_Session", False) and row.get("Session_Length", 1) > 1:
+    # Plain zip over the column arrays; iterrows would box every row into a Series
+    for subj, is_long, total_periods, session_length in zip(
+        subject_df["Subject"].to_numpy(),
+        subject_df["Is_Long_Session"].to_numpy(),
+        subject_df["Periods_per_Week"].to_numpy(),
+        subject_df["Session_Length"].to_numpy(),
+    ):
+        if is_long and session_length > 1:
             # Calculate how many blocks required based on total periods and session length
-            total_periods = int(row.get("Periods_per_Week", 0))
             if total_periods > 0:
-                num_blocks = total_periods // int(row["Session_Length"])
+                num_blocks = int(total_periods) // int(session_length)
                 for _ in range(num_blocks):
-                    blocks.append((subj, int(row["Session_Length"])))
+                    blocks.append((subj, int(session_length)))
         else:
-            singles[subj] = singles.get(subj, 0) + int(row.get("Periods_per_Week", 0))
+            singles[subj] = singles.get(subj, 0) + int(total_periods)
     return singles, blocks
 
-def can_place_block(day_row, start_idx, length):
-    """Check if a block of given length fits contiguously into the day's row."""
-    if start_idx + length > len(day_row):
-        return False
-    return all(day_row[i] == "" for i in range(start_idx, start_idx + length))
+@njit(cache=True, nogil=True)
+def _seed_kernels(seed):
+    """Seed the scheduler kernels' RNG state.
 
-def place_blocks(tt, blocks, days, periods_per_day):
-    """Place long sessions (blocks) first."""
-    random.shuffle(blocks)
-    blocks.sort(key=lambda b: -b[1])  # Longest first
-    last_day_for_subject = {}
+    Under numba each thread has its own np.random state; the plain-Python
+    fallback seeds the process-global one instead, which is why scheduling
+    runs sequentially without numba (see the generate handler below).
+    """
+    np.random.seed(seed)
+
+@lru_cache(maxsize=None)
+def _window_masks(periods_per_day):
+    """Precompute the occupancy bitmask of every (length, start) window.
+
+    Streamlit reruns reuse the same periods_per_day, so this is built once
+    per configuration; the kernels then fetch window masks as immediate
+    table constants instead of recomputing ((1 << L) - 1) << p per attempt.
+    """
+    table = np.zeros((periods_per_day + 1, periods_per_day), dtype=np.uint16)
+    for length in range(1, periods_per_day + 1):
+        for p in range(periods_per_day - length + 1):
+            table[length, p] = ((1 << length) - 1) << p
+    return table
+
+@njit(cache=True, nogil=True)
+def _can_place(day_masks, masks, day_idx, start_idx, length):
+    """Check if a block of given length fits contiguously into the day.
+
+    Each day is a uint16 bitmask (bit p set = slot p occupied, fits because
+    periods_per_day <= 12), so the whole window test is one AND-compare
+    against the precomputed window mask.
+    """
+    return day_masks[day_idx] & masks[length, start_idx] == 0
+
+@njit(cache=True, nogil=True)
+def _unplace(grid, long_mask, day_masks, masks, d, p, length):
+    """Undo one block placement at (d, p)."""
+    grid[d, p:p + length] = 0
+    long_mask[d, p:p + length] = False
+    day_masks[d] &= np.uint16(~masks[length, p] & 0xFFFF)
+
+@njit(cache=True, nogil=True)
+def _place_blocks(grid, long_mask, blocks, last_day, masks):
+    """Place long sessions (blocks) first.
+
+    Runs the backjumping search with a bounded placement budget and a
+    handful of randomized restarts: the search runtime is heavy-tailed, so
+    a fresh random ordering is usually cheaper than grinding on. Restarts
+    are skipped when the search proved the instance infeasible.
+    """
+    for _ in range(10):
+        result = _search_blocks(grid, long_mask, blocks, last_day, masks, 50_000)
+        if result >= 0:
+            return result == 1
+        grid[:] = 0
+        long_mask[:] = False
+        last_day[:] = -1
+    return False
+
+@njit(cache=True, nogil=True)
+def _search_blocks(grid, long_mask, blocks, last_day, masks, budget):
+    """One bounded search pass: forward checking, MRV ordering and
+    conflict-directed backjumping.
+
+    blocks is an (N, 2) int32 array of (subject_id, length) rows;
+    last_day is an int32 array indexed by subject id (-1 = unseen).
+
+    Every block keeps a domain of legal (day, start) positions. Committing
+    a placement prunes overlapping positions from the unplaced blocks'
+    domains (forward checking), and the next block picked is always the
+    one with the fewest positions left (minimum remaining values, ties
+    longest first). On a dead end we jump back to the deepest assignment
+    recorded in the conflict set, undoing everything in between.
+
+    Returns 1 on success, 0 if proven infeasible, -1 if the budget ran out.
+    """
+    days, periods_per_day = grid.shape
+    n = blocks.shape[0]
+    day_masks = np.zeros(days, dtype=np.uint16)
+
+    # pruned_by[k, d, p] = depth whose placement removed (d, p) from block
+    # k's domain; -1 = still available, -2 = geometrically impossible.
+    pruned_by = np.full((n, days, periods_per_day), -1, dtype=np.int32)
+    dom_count = np.zeros(n, dtype=np.int32)
+    for k in range(n):
+        width = periods_per_day - blocks[k, 1] + 1
+        if width <= 0:
+            return 0
+        pruned_by[k, :, width:] = -2
+        dom_count[k] = days * width
+
+    max_cand = days * periods_per_day
+    cand_d = np.zeros((n, max_cand), dtype=np.int32)  # candidate (day, start) per block
+    cand_p = np.zeros((n, max_cand), dtype=np.int32)
+    cand_n = np.zeros(n, dtype=np.int32)
+    ci = np.zeros(n, dtype=np.int32)  # next candidate to try
+    conf = np.zeros((n, n), dtype=np.bool_)  # conf[k, t]: depth t constrained block k
+    var_at = np.full(n, -1, dtype=np.int32)  # depth -> block index
+    assigned = np.zeros(n, dtype=np.bool_)
+    pos_d = np.full(n, -1, dtype=np.int32)
+    pos_p = np.full(n, -1, dtype=np.int32)
+    prev_ld = np.full(n, -1, dtype=np.int32)
+
+    # Stack of forward-checking prunes, restored per depth on backjump
+    rem_k = np.zeros(n * max_cand, dtype=np.int32)
+    rem_d = np.zeros(n * max_cand, dtype=np.int32)
+    rem_p = np.zeros(n * max_cand, dtype=np.int32)
+    rem_top = 0
+    rem_start = np.zeros(n, dtype=np.int32)
+
+    t = 0
+    fresh = True
+    b = -1
+    while t < n:
+        if fresh:
+            # MRV: smallest domain first, ties longest first, then random
+            b = -1
+            n_tie = 0
+            for k in range(n):
+                if assigned[k]:
+                    continue
+                if b < 0 or dom_count[k] < dom_count[b] or \
+                        (dom_count[k] == dom_count[b] and blocks[k, 1] > blocks[b, 1]):
+                    b = k
+                    n_tie = 1
+                elif dom_count[k] == dom_count[b] and blocks[k, 1] == blocks[b, 1]:
+                    n_tie += 1
+                    if np.random.randint(0, n_tie) == 0:
+                        b = k
+            subj_id = np.int8(blocks[b, 0])
+            length = blocks[b, 1]
+            # Candidate ordering: shuffled days (subject's previous day
+            # first), start slots ascending within a day. The shuffle keeps
+            # an inverse permutation so the previous day's position is an
+            # O(1) lookup rather than a scan.
+            day_order = np.arange(days)
+            day_pos = np.arange(days)  # day_pos[day] = index within day_order
+            for i in range(days - 1, 0, -1):
+                j = np.random.randint(0, i + 1)
+                day_order[i], day_order[j] = day_order[j], day_order[i]
+                day_pos[day_order[i]] = i
+                day_pos[day_order[j]] = j
+            ld = last_day[subj_id]
+            start = day_pos[ld] if ld >= 0 else 0
+            nc = 0
+            for di in range(days):
+                d = day_order[(start + di) % days]
+                for p in range(periods_per_day - length + 1):
+                    cand_d[b, nc] = d
+                    cand_p[b, nc] = p
+                    nc += 1
+            cand_n[b] = nc
+            ci[b] = 0
+            conf[b, :] = False
+            var_at[t] = b
+        else:
+            b = var_at[t]
+            subj_id = np.int8(blocks[b, 0])
+            length = blocks[b, 1]
 
-    for subj, length in blocks:
         placed = False
-        day_order = list(range(days))
-        random.shuffle(day_order)
-        if subj in last_day_for_subject:
-            ld = last_day_for_subject[subj]
-            day_order = day_order[day_order.index(ld):] + day_order[:day_order.index(ld)]
-
-        for d in day_order:
-            for p in range(periods_per_day):
-                if can_place_block(tt[d], p, length):
-                    for k in range(p, p + length):
-                        tt[d][k] = subj + " (Long Session)"
-                    last_day_for_subject[subj] = d
-                    placed = True
+        while ci[b] < cand_n[b]:
+            budget -= 1
+            if budget < 0:
+                return -1
+            d = cand_d[b, ci[b]]
+            p = cand_p[b, ci[b]]
+            ci[b] += 1
+            if not _can_place(day_masks, masks, d, p, length):
+                # Pruned by an earlier depth: remember who
+                if pruned_by[b, d, p] >= 0:
+                    conf[b, pruned_by[b, d, p]] = True
+                continue
+            # Forward-check: prune overlapping positions of unplaced blocks
+            rem_start[t] = rem_top
+            wipe = -1
+            for j in range(n):
+                if assigned[j] or j == b:
+                    continue
+                lj = blocks[j, 1]
+                lo = p - lj + 1
+                if lo < 0:
+                    lo = 0
+                hi = p + length
+                if hi > periods_per_day - lj + 1:
+                    hi = periods_per_day - lj + 1
+                for q in range(lo, hi):
+                    if pruned_by[j, d, q] == -1:
+                        pruned_by[j, d, q] = t
+                        rem_k[rem_top] = j
+                        rem_d[rem_top] = d
+                        rem_p[rem_top] = q
+                        rem_top += 1
+                        dom_count[j] -= 1
+                if dom_count[j] == 0:
+                    wipe = j
                     break
-            if placed:
-                break
+            if wipe >= 0:
+                # Wiped out a future block: every depth that pruned it
+                # conflicts with b; retract this candidate and move on
+                for dd in range(days):
+                    for q in range(periods_per_day):
+                        pb = pruned_by[wipe, dd, q]
+                        if pb >= 0 and pb != t:
+                            conf[b, pb] = True
+                while rem_top > rem_start[t]:
+                    rem_top -= 1
+                    pruned_by[rem_k[rem_top], rem_d[rem_top], rem_p[rem_top]] = -1
+                    dom_count[rem_k[rem_top]] += 1
+                continue
+            grid[d, p:p + length] = subj_id
+            long_mask[d, p:p + length] = True
+            day_masks[d] |= masks[length, p]
+            prev_ld[b] = last_day[subj_id]
+            last_day[subj_id] = d
+            pos_d[b] = d
+            pos_p[b] = p
+            assigned[b] = True
+            placed = True
+            break
+
+        if placed:
+            t += 1
+            fresh = True
+        else:
+            # Dead end: jump to the deepest depth that constrained b
+            jump = -1
+            for u in range(t - 1, -1, -1):
+                if conf[b, u]:
+                    jump = u
+                    break
+            if jump < 0:
+                return 0
+            bj = var_at[jump]
+            for u in range(jump):
+                if conf[b, u]:
+                    conf[bj, u] = True
+            for u in range(t - 1, jump - 1, -1):
+                bu = var_at[u]
+                while rem_top > rem_start[u]:
+                    rem_top -= 1
+                    pruned_by[rem_k[rem_top], rem_d[rem_top], rem_p[rem_top]] = -1
+                    dom_count[rem_k[rem_top]] += 1
+                _unplace(grid, long_mask, day_masks, masks, pos_d[bu], pos_p[bu], blocks[bu, 1])
+                last_day[np.int8(blocks[bu, 0])] = prev_ld[bu]
+                assigned[bu] = False
+                pos_d[bu] = -1
+                pos_p[bu] = -1
+            t = jump
+            fresh = False
+    return 1
 
-        if not placed:
-            return False
-    return True
+@njit(cache=True, nogil=True)
+def _heap_push(keys, ids, size, key, sid):
+    """Push onto the array-backed max-heap; returns the new size."""
+    i = size
+    keys[i] = key
+    ids[i] = sid
+    while i > 0:
+        parent = (i - 1) // 2
+        if keys[parent] >= keys[i]:
+            break
+        keys[parent], keys[i] = keys[i], keys[parent]
+        ids[parent], ids[i] = ids[i], ids[parent]
+        i = parent
+    return size + 1
 
-def pick_single_subject(remaining, used_today):
-    """Pick a subject with remaining > 0 and not used today."""
-    candidates = [(s, c) for s, c in remaining.items() if c > 0 and s not in used_today]
-    if not candidates:
-        return None
-    max_rem = max(c for _, c in candidates)
-    top = [s for s, c in candidates if c == max_rem]
-    return random.choice(top)
+@njit(cache=True, nogil=True)
+def _heap_pop(keys, ids, size):
+    """Pop the max entry; returns (key, subject_id, new size)."""
+    key = keys[0]
+    sid = ids[0]
+    size -= 1
+    keys[0] = keys[size]
+    ids[0] = ids[size]
+    i = 0
+    while True:
+        left = 2 * i + 1
+        if left >= size:
+            break
+        child = left
+        if left + 1 < size and keys[left + 1] > keys[left]:
+            child = left + 1
+        if keys[i] >= keys[child]:
+            break
+        keys[child], keys[i] = keys[i], keys[child]
+        ids[child], ids[i] = ids[i], ids[child]
+        i = child
+    return key, sid, size
+
+@njit(cache=True, nogil=True)
+def _singles_key(count):
+    """Heap key: remaining count in the high bits, random tiebreak below."""
+    return (np.int64(count) << 16) | np.random.randint(0, 1 << 16)
+
+@njit(cache=True, nogil=True)
+def _fill_singles(grid, counts):
+    """Fill empty slots with single periods; counts is int32 indexed by subject id.
+
+    Each slot takes the subject with the highest remaining count that has not
+    appeared on that day yet, ties broken at random. Subjects live in a
+    max-heap keyed on remaining count, so a slot costs O(log S) plus
+    re-pushing the few entries deferred because they already ran today.
+    """
+    days, periods_per_day = grid.shape
+    n = counts.shape[0]
+    keys = np.zeros(n, dtype=np.int64)
+    ids = np.zeros(n, dtype=np.int32)
+    size = 0
+    for s in range(1, n):
+        if counts[s] > 0:
+            size = _heap_push(keys, ids, size, _singles_key(counts[s]), s)
+    def_keys = np.zeros(n, dtype=np.int64)
+    def_ids = np.zeros(n, dtype=np.int32)
 
-def fill_singles(tt, singles, days, periods_per_day):
     for d in range(days):
-        used_today = set([s.replace(" (Long Session)", "") for s in tt[d] if s])
+        used = np.zeros(n, dtype=np.bool_)
+        for p in range(periods_per_day):
+            if grid[d, p] != 0:
+                used[grid[d, p]] = True
         for p in range(periods_per_day):
-            if tt[d][p] != "":
+            if grid[d, p] != 0:
                 continue
-            subj = pick_single_subject(singles, used_today)
-            if subj is None:
+            if size == 0:
+                break
+            pick = 0
+            n_def = 0
+            while size > 0:
+                key, sid, size = _heap_pop(keys, ids, size)
+                if used[sid]:
+                    def_keys[n_def] = key
+                    def_ids[n_def] = sid
+                    n_def += 1
+                else:
+                    pick = sid
+                    break
+            for i in range(n_def):
+                size = _heap_push(keys, ids, size, def_keys[i], def_ids[i])
+            if pick == 0:
                 continue
-            tt[d][p] = subj
-            singles[subj] -= 1
-            used_today.add(subj)
-    return all(v <= 0 for v in singles.values())
-
-def schedule_class(subject_df: pd.DataFrame, days: int, periods_per_day: int):
-    """Return timetable as list of lists."""
-    tt = [["" for _ in range(periods_per_day)] for _ in range(days)]
+            grid[d, p] = pick
+            counts[pick] -= 1
+            used[pick] = True
+            if counts[pick] > 0:
+                size = _heap_push(keys, ids, size, _singles_key(counts[pick]), pick)
+    return np.all(counts <= 0)
+
+def render_grid(grid, long_mask, subject_names):
+    """Map the id grid back to a 2D object array of display strings (0 = empty slot)."""
+    names_table = np.array([""] + subject_names, dtype=object)
+    long_table = np.array([""] + [s + " (Long Session)" for s in subject_names], dtype=object)
+    return np.where(long_mask, long_table[grid], names_table[grid])
+
+def schedule_class(subject_df: pd.DataFrame, days: int, periods_per_day: int, rng: random.Random = None, use_cache: bool = True):
+    """Return timetable as a (days, periods) object array of cell strings.
+
+    rng drives all placement randomness for this class; passing a seeded
+    instance makes the timetable reproducible. With use_cache the work is
+    cached on (subject table content, shape, seed), so reruns that only
+    touch unrelated widgets reuse the previous result. With 'Randomize
+    placement' on, every generate click derives a fresh seed, so the UI
+    passes use_cache=False there -- caching would never hit but would
+    still store every result.
+    """
+    if rng is None:
+        rng = random.Random()
+    seed = rng.getrandbits(31)
+    if not use_cache:
+        return _schedule_class_impl(subject_df, days, periods_per_day, seed)
+    subj_rows = tuple(map(tuple, subject_df.itertuples(index=False)))
+    columns = tuple(subject_df.columns)
+    return _schedule_class_cached(subj_rows, columns, days, periods_per_day, seed)
+
+@st.cache_data(show_spinner=False)
+def _schedule_class_cached(subj_rows, columns, days: int, periods_per_day: int, seed: int):
+    """Cached front of _schedule_class_impl; subj_rows is the subject table
+    as a tuple of row tuples so Streamlit can hash it."""
+    return _schedule_class_impl(pd.DataFrame(list(subj_rows), columns=list(columns)), days, periods_per_day, seed)
+
+def _schedule_class_impl(subject_df: pd.DataFrame, days: int, periods_per_day: int, seed: int):
+    _seed_kernels(seed)
     singles, blocks = build_requirements(subject_df)
+    # Only subjects that actually need periods get ids: those are bounded by
+    # the capacity check below (at most days * periods_per_day of them), so
+    # ids always fit the int8 grid no matter how many zero-period rows the
+    # editor holds
+    used = {s for s, c in singles.items() if c > 0} | {s for s, _ in blocks}
+    subject_names = [s for s in dict.fromkeys(subject_df["Subject"].tolist()) if s in used]
+    subject_ids = {name: i + 1 for i, name in enumerate(subject_names)}
+    grid = np.zeros((days, periods_per_day), dtype=np.int8)
+    long_mask = np.zeros((days, periods_per_day), dtype=bool)
+
     total_required = sum(singles.values()) + sum(bl for _, bl in blocks)
     capacity = days * periods_per_day
     if total_required > capacity:
-        return False, tt, f"Required {total_required} periods but only {capacity} slots available."
+        return False, render_grid(grid, long_mask, subject_names), f"Required {total_required} periods but only {capacity} slots available."
+
+    # Cheap O(S) infeasibility checks so impossible configs fail instantly
+    # instead of after a full backtracking search
+    for subj, count in singles.items():
+        if count > days:
+            return False, render_grid(grid, long_mask, subject_names), f"'{subj}' needs {count} single periods but at most one fits per day across {days} days."
+    for subj, length in blocks:
+        if length > periods_per_day:
+            return False, render_grid(grid, long_mask, subject_names), f"'{subj}' has session length {length} but days only have {periods_per_day} periods."
 
-    if not place_blocks(tt, blocks, days, periods_per_day):
-        return False, tt, "Could not place all long sessions."
+    blocks_arr = np.array([[subject_ids[s], length] for s, length in blocks], dtype=np.int32).reshape(-1, 2)
+    counts = np.zeros(len(subject_names) + 1, dtype=np.int32)
+    for s, c in singles.items():
+        if c > 0:
+            counts[subject_ids[s]] += c
+    last_day = np.full(len(subject_names) + 1, -1, dtype=np.int32)
 
-    if not fill_singles(tt, singles, days, periods_per_day):
-        remaining = {k: v for k, v in singles.items() if v > 0}
-        return False, tt, f"Couldn't allocate all sessions. Remaining: {remaining}"
+    if not _place_blocks(grid, long_mask, blocks_arr, last_day, _window_masks(periods_per_day)):
+        return False, render_grid(grid, long_mask, subject_names), "Could not place all long sessions."
 
-    return True, tt, "Timetable generated."
+    if not _fill_singles(grid, counts):
+        remaining = {subject_names[s - 1]: int(c) for s, c in enumerate(counts) if c > 0}
+        return False, render_grid(grid, long_mask, subject_names), f"Couldn't allocate all sessions. Remaining: {remaining}"
+
+    return True, render_grid(grid, long_mask, subject_names), "Timetable generated."
+
+def _schedule_one(args):
+    """Schedule a single class; helper for the executor map below."""
+    class_name, subj_df, days, periods_per_day, rng, use_cache = args
+    return class_name, schedule_class(subj_df, days, periods_per_day, rng, use_cache)
 
 # ------------------------- APP UI -------------------------
 st.title("Automatic Timetable Generator")
@@ -184,20 +559,37 @@ with col_right:
     randomize_seed = st.checkbox("Randomize placement (shuffle)", value=True)
 
 if generate:
-    if randomize_seed:
-        random.seed()
-
     all_tables = {}
     any_error = False
     errors = []
 
-    for class_name, subj_df in class_configs:
-        ok, grid, msg = schedule_class(subj_df, int(days), int(periods_per_day))
+    args = [
+        (class_name, subj_df, int(days), int(periods_per_day),
+         random.Random() if randomize_seed else random.Random(42 + idx),
+         not randomize_seed)
+        for idx, (class_name, subj_df) in enumerate(class_configs)
+    ]
+    if _HAVE_NUMBA:
+        # Each class schedules independently; the nogil kernels release the
+        # GIL, so a thread pool runs them genuinely in parallel.
+        with ThreadPoolExecutor() as ex:
+            results = list(ex.map(_schedule_one, args))
+    else:
+        # The plain-Python kernels share np.random's global state, so
+        # concurrent workers would clobber each other's per-class seeds;
+        # schedule sequentially to keep fixed seeds deterministic.
+        results = [_schedule_one(a) for a in args]
+
+    col_labels = [f"P{p+1}\n{time_labels[p]}" for p in range(periods_per_day)]
+    day_labels = [f"Day {i+1}" for i in range(days)]
+    for class_name, (ok, grid, msg) in results:
         if not ok:
             any_error = True
             errors.append(f"[{class_name}] {msg}")
-        df = pd.DataFrame(grid, columns=[f"P{p+1}\n{time_labels[p]}" for p in range(periods_per_day)])
-        df.insert(0, "Day", [f"Day {i+1}" for i in range(days)])
+        # grid is already one contiguous object array, so pandas wraps it
+        # without per-cell dtype inference
+        df = pd.DataFrame(grid, columns=col_labels)
+        df.insert(0, "Day", day_labels)
         all_tables[class_name] = df
 
     if any_error:
@@ -212,10 +604,10 @@ if generate:
 
     if all_tables:
         output = BytesIO()
+        # NOTE: xlsxwriter's constant_memory mode is incompatible with
+        # to_excel, which writes body cells column by column -- flushed rows
+        # are silently dropped, leaving only the first column intact
         with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            for cname, df in all_tables.items():
-                safe_name = cname if len(cname) <= 31 else cname[:28] + "..."
-                df.to_excel(writer, index=False, sheet_name=safe_name)
             cover = pd.DataFrame({
                 "Info": [
                     "Automatic Timetable Generator",
@@ -226,6 +618,9 @@ if generate:
                 ]
             })
             cover.to_excel(writer, index=False, sheet_name="Summary")
+            safe_names = {cname: cname if len(cname) <= 31 else cname[:28] + "..." for cname in all_tables}
+            for cname, df in all_tables.items():
+                df.to_excel(writer, index=False, sheet_name=safe_names[cname])
         st.download_button(
             label="Download Excel Workbook",
             data=output.getvalue(),